@@ -1,9 +1,11 @@
 from aio_api_ros import errors
 from .connection import ApiRosConnection
+from .pool import ApiRosPool
 
 version = '0.0.19'
 
 __all__ = [
     'ApiRosConnection',
+    'ApiRosPool',
     'errors'
 ]
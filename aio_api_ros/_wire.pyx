@@ -0,0 +1,105 @@
+# cython: language_level=3
+"""
+C versions of the wire helpers from aio_api_ros.connection
+"""
+from cpython.bytes cimport PyBytes_AS_STRING
+from cpython.bytes cimport PyBytes_FromStringAndSize
+from libc.string cimport memchr
+from libc.string cimport memcmp
+from libc.string cimport memcpy
+
+
+cdef extern from "Python.h":
+    const char* PyUnicode_AsUTF8AndSize(object s, Py_ssize_t* size) except NULL
+
+
+cdef const char* MESSAGE_ATTR = b'=message='
+cdef Py_ssize_t MESSAGE_ATTR_LEN = 9
+
+
+cdef Py_ssize_t _write_len(unsigned char* out, Py_ssize_t length) except -1:
+    # raise what the pure python _encode_len raises for such lengths
+    if length < 0:
+        raise ValueError('word length must not be negative')
+    if length > 0xFFFFFFFF:
+        raise OverflowError('word length does not fit in 4 bytes')
+    if length < 0x80:
+        out[0] = <unsigned char>length
+        return 1
+    if length < 0x4000:
+        out[0] = <unsigned char>((length >> 8) | 0x80)
+        out[1] = <unsigned char>length
+        return 2
+    if length < 0x200000:
+        out[0] = <unsigned char>((length >> 16) | 0xC0)
+        out[1] = <unsigned char>(length >> 8)
+        out[2] = <unsigned char>length
+        return 3
+    if length < 0x10000000:
+        out[0] = <unsigned char>((length >> 24) | 0xE0)
+        out[1] = <unsigned char>(length >> 16)
+        out[2] = <unsigned char>(length >> 8)
+        out[3] = <unsigned char>length
+        return 4
+    out[0] = 0xF0
+    out[1] = <unsigned char>(length >> 24)
+    out[2] = <unsigned char>(length >> 16)
+    out[3] = <unsigned char>(length >> 8)
+    out[4] = <unsigned char>length
+    return 5
+
+
+cpdef bytes encode_len(Py_ssize_t length):
+    """
+    Encode word length as described in the Mikrotik api protocol
+    :param length: int
+    :return: bytes
+    """
+    cdef unsigned char out[5]
+    cdef Py_ssize_t size = _write_len(out, length)
+    return PyBytes_FromStringAndSize(<char*>out, size)
+
+
+cpdef bytes pack_word(str word):
+    """
+    Encode word with its length prefix
+    :param word: str
+    :return: bytes
+    """
+    cdef Py_ssize_t n
+    cdef const char* p = PyUnicode_AsUTF8AndSize(word, &n)
+    cdef unsigned char prefix[5]
+    cdef Py_ssize_t size = _write_len(prefix, n)
+    cdef bytes res = PyBytes_FromStringAndSize(NULL, size + n)
+    cdef char* out = PyBytes_AS_STRING(res)
+    memcpy(out, prefix, size)
+    memcpy(out + size, p, n)
+    return res
+
+
+cpdef tuple find_message(const unsigned char[::1] buf):
+    """
+    Find bounds of the =message= attribute value
+    :param buf: mikrotik response
+    :return: (start, end) or (-1, -1) if there is no message
+    """
+    cdef Py_ssize_t n = buf.shape[0]
+    cdef Py_ssize_t i = 0
+    cdef const unsigned char* base
+    cdef const unsigned char* hit
+    if n < MESSAGE_ATTR_LEN:
+        return -1, -1
+    base = &buf[0]
+    while i <= n - MESSAGE_ATTR_LEN:
+        hit = <const unsigned char*>memchr(
+            base + i, b'=', n - MESSAGE_ATTR_LEN - i + 1
+        )
+        if hit == NULL:
+            break
+        i = hit - base
+        if memcmp(hit, MESSAGE_ATTR, MESSAGE_ATTR_LEN) == 0:
+            i += MESSAGE_ATTR_LEN
+            hit = <const unsigned char*>memchr(base + i, 0, n - i)
+            return i, (hit - base if hit != NULL else n)
+        i += 1
+    return -1, -1
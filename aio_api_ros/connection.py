@@ -1,16 +1,119 @@
 import asyncio
-import hashlib
-import binascii
+import functools
+import sys
 
 from .errors import LoginFailed
 from .errors import UnpackValueError
-from .unpacker import SentenceUnpacker
 from .parser import parse_sentence
 
 ERROR_TAG = '!trap'
 FATAL_ERROR_TAG = '!fatal'
+ERROR_TAG_B = ERROR_TAG.encode()
+FATAL_ERROR_TAG_B = FATAL_ERROR_TAG.encode()
+MESSAGE_ATTR = b'=message='
+RET_ATTR = b'%=ret='
+DONE_TAG = b'!done'
 DEFAULT_READ_DATA_LEN = 4096
 LOGIN_DATA_LEN = 128
+TRAP_REPLY = sys.intern(ERROR_TAG)
+# reply word of what _read_sentence returns once the stream has ended,
+# an empty sentence has None instead
+_EOF = object()
+
+
+def _encode_len(length: int) -> bytes:
+    """
+    Encode word length as described in the Mikrotik api protocol
+    :param length: int
+    :return: bytes
+    """
+    if length < 0x80:
+        return bytes((length,))
+    if length < 0x4000:
+        return (length | 0x8000).to_bytes(2, 'big')
+    if length < 0x200000:
+        return (length | 0xC00000).to_bytes(3, 'big')
+    if length < 0x10000000:
+        return (length | 0xE0000000).to_bytes(4, 'big')
+    return b'\xF0' + length.to_bytes(4, 'big')
+
+
+def _pack_word(word: str) -> bytes:
+    """
+    Encode word with its length prefix
+    :param word: str
+    :return: bytes
+    """
+    encoded = word.encode()
+    return _encode_len(len(encoded)) + encoded
+
+
+def _find_message(data: bytes) -> tuple:
+    """
+    Find bounds of the =message= attribute value
+    :param data: mikrotik response
+    :return: (start, end) or (-1, -1) if there is no message
+    """
+    start = data.find(MESSAGE_ATTR)
+    if start < 0:
+        return -1, -1
+    start += len(MESSAGE_ATTR)
+    end = data.find(b'\x00', start)
+    return start, end if end >= 0 else len(data)
+
+
+def _scan_sentence(buf, pos=0, words=None) -> tuple:
+    """
+    Find the end of the first sentence in buffer
+    :param buf: received bytes
+    :param pos: offset of the first word not scanned yet
+    :param words: word bounds found by the previous call, if any
+    :return: (end offset, pos, words), end offset is -1 if sentence is
+     incomplete, pos and words resume the scan when more bytes arrive;
+     words is the list of (start, end) offsets of each word in buffer
+    """
+    if words is None:
+        words = []
+    size = len(buf)
+    while pos < size:
+        first = buf[pos]
+        if first < 0x80:
+            prefix_len, length = 1, first
+        elif first < 0xC0:
+            prefix_len, length = 2, first & 0x3F
+        elif first < 0xE0:
+            prefix_len, length = 3, first & 0x1F
+        elif first < 0xF0:
+            prefix_len, length = 4, first & 0x0F
+        elif first == 0xF0:
+            prefix_len, length = 5, 0
+        else:
+            raise UnpackValueError('Unknown control byte {}'.format(first))
+        if pos + prefix_len > size:
+            break
+        for byte in buf[pos + 1:pos + prefix_len]:
+            length = (length << 8) | byte
+        if length == 0:
+            return pos + 1, pos + 1, words
+        start = pos + prefix_len
+        if start + length > size:
+            break
+        pos = start + length
+        words.append((start, pos))
+    return -1, pos, words
+
+
+try:
+    from ._wire import encode_len as _encode_len
+    from ._wire import find_message as _find_message
+    from ._wire import pack_word as _pack_word
+except ImportError:
+    pass
+
+# command paths repeat between queries, attribute words carry values
+# (passwords included) and go through _pack_word directly
+_encode_word = functools.lru_cache(maxsize=1024)(_pack_word)
+
 
 class ApiRosConnection:
     """
@@ -24,38 +127,69 @@ class ApiRosConnection:
         self.user = mk_user
         self.password = mk_psw
         self.used = False
+        self.reader = None
         self.writer = None
+        # received bytes not yet consumed as a whole sentence
+        self._read_buf = bytearray()
+        # where scanning of an incomplete sentence in _read_buf stopped
+        self._scan_state = (0, None)
+        # sent sentences whose !done was not read yet
+        self._pending_replies = 0
+        # credentials are fixed per connection, encode them only once
+        self._login_frame = self._encode_sentence(self._get_login_sentence())
 
     async def connect(self):
+        self._read_buf = bytearray()
+        self._scan_state = (0, None)
+        self._pending_replies = 0
         self.reader, self.writer = await asyncio.open_connection(
             self.ip, self.port
         )
         await self.login()
 
-    def __del__(self):
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
         self.close()
 
+    def __del__(self):
+        # __init__ may have failed before writer was set
+        writer = getattr(self, 'writer', None)
+        if writer is not None and not writer.is_closing():
+            try:
+                writer.close()
+            except Exception:
+                pass
+
     def __repr__(self):
         return 'Connection to %s:%s id=%s' % (self.ip, self.port, id(self))
 
     @staticmethod
-    def _to_bytes(str_value: str):
+    def _encode_frames(sentence) -> list:
         """
-        Convert string to bytes
-        :param str_value: str
-        :return: bytes
+        Encode list of commands into list of wire frames
+        :param sentence: iterable of commands, may be empty
+        :return: list of bytes
         """
-        length = (len(str_value).bit_length() // 8) + 1
-        res = len(str_value).to_bytes(length, byteorder='little')
-        return res
+        frames = []
+        words = iter(sentence)
+        command = next(words, None)
+        if command is not None:
+            frames.append(_encode_word(command))
+            frames.extend(_pack_word(word) for word in words)
+        frames.append(b'\x00')
+        return frames
 
-    def _talk_end(self):
+    @classmethod
+    def _encode_sentence(cls, sentence) -> bytes:
         """
-        Send EOC (end of command) to mikrotik api
-        :return:
+        Encode list of commands into a single wire frame
+        :param sentence: iterable of commands, may be empty
+        :return: bytes
         """
-        self.writer.write(self._to_bytes(''))
-        self.writer.write(''.encode())
+        return b''.join(cls._encode_frames(sentence))
 
     def talk_word(self, str_value: str, send_end=True):
         """
@@ -64,20 +198,31 @@ class ApiRosConnection:
         :param send_end: bool Flag - send end after this command
         :return:
         """
-        self.writer.write(self._to_bytes(str_value))
-        self.writer.write(str_value.encode())
         if send_end:
-            self._talk_end()
+            self.talk_sentence([str_value])
+        else:
+            self.writer.write(_pack_word(str_value))
 
     def talk_sentence(self, sentence: list):
         """
-        Send list of commands
+        Send list of commands with a single writelines call
         :param sentence: Send list of commands
         :return:
         """
-        for word in sentence:
-            self.talk_word(word, False)
-        self._talk_end()
+        self.writer.writelines(self._encode_frames(sentence))
+        self._pending_replies += 1
+
+    def is_clean(self) -> bool:
+        """
+        Connection is open and has no replies left to read
+        :return:
+        """
+        return (
+            self.writer is not None and
+            not self.writer.is_closing() and
+            not self.reader.at_eof() and
+            not self._pending_replies
+        )
 
     def close(self):
         """
@@ -100,30 +245,29 @@ class ApiRosConnection:
         ]
 
     @staticmethod
-    def _get_err_message(data):
+    def _get_err_message(data: bytes):
         """
         Parse error message from mikrotik response
         :param data:
         :return:
         """
-        return data.decode().split('=message=')[1].split('\x00')[0]
+        start, end = _find_message(data)
+        if start < 0:
+            return ''
+        return data[start:end].decode('utf-8', 'replace')
 
     @staticmethod
-    def _get_challenge_arg(data):
+    def _get_challenge_arg(data: bytes):
         """
         Parse from mikrotik response challenge argument
         :param data:
         :return:
         """
-        try:
-            response_str = data.decode('UTF-8', 'replace')
-            res_list = response_str.split('!done')
-            str_val = res_list[1]
-            res_list = str_val.split('%=ret=')
-            res = str(res_list[1])
-        except IndexError:
+        done = data.find(DONE_TAG)
+        start = data.find(RET_ATTR, done) if done >= 0 else -1
+        if start < 0:
             raise LoginFailed('Getting challenge argument failed')
-        return res
+        return data[start + len(RET_ATTR):].decode('UTF-8', 'replace')
 
     @staticmethod
     def _get_result_dict(code: int, message: str) -> dict:
@@ -136,35 +280,84 @@ class ApiRosConnection:
         return {'code': code, 'message': message}
 
     async def query(self, path, *args, optional=False):
+        # reply of a query left before its end is still in the stream
+        while self._pending_replies:
+            await self.read()
         self.talk_sentence((path,) + args)
-        data = await self.read()
-        unpacker = SentenceUnpacker()
-        unpacker.feed(data)
-        for sentence in unpacker:
-            resp, _, obj = parse_sentence(sentence)
-            if resp == "!trap":
-                if optional and obj["message"] == "no such command prefix":
-                    return
-                raise Exception("Caught trap while querying %s %s" % (path, obj))
-            if resp == "!done":
+        await self.writer.drain()
+        buf = self._read_buf
+        trap = None
+        while True:
+            reply, end, bounds = await self._read_sentence()
+            if reply is _EOF or reply == DONE_TAG:
+                del buf[:end]
                 break
-            yield obj
+            # words are decoded right from the bounds found by the scan,
+            # the view must be gone before the sentence is deleted
+            with memoryview(buf) as view:
+                words = [str(view[start:stop], 'ascii')
+                         for start, stop in bounds]
+            del buf[:end]
+            if not words:
+                continue
+            resp, _, obj = parse_sentence(words)
+            if resp is TRAP_REPLY:
+                # keep reading up to !done, the reply must be consumed
+                trap = obj
+            elif trap is None:
+                yield obj
+        if trap is not None:
+            if optional and trap.get("message") == "no such command prefix":
+                return
+            raise Exception("Caught trap while querying %s %s" % (path, trap))
+
+    async def _read_sentence(self, length=DEFAULT_READ_DATA_LEN):
+        """
+        Read until a whole sentence is at the start of the read buffer,
+        the caller deletes it from there once it is used
+        :param length: chunk size to read from socket
+        :return: (reply word, sentence length, word bounds), reply word is
+         None for an empty sentence and _EOF once the stream has ended
+        """
+        buf = self._read_buf
+        while True:
+            end, pos, words = _scan_sentence(buf, *self._scan_state)
+            if end == -1:
+                # words already complete are not scanned again
+                self._scan_state = (pos, words)
+            else:
+                self._scan_state = (0, None)
+                reply = None
+                if words:
+                    start, stop = words[0]
+                    reply = bytes(buf[start:stop])
+                if reply == DONE_TAG and self._pending_replies:
+                    self._pending_replies -= 1
+                return reply, end, words
+            chunk = await self.reader.read(length)
+            if not chunk:
+                # nothing more will arrive
+                self._pending_replies = 0
+                self._scan_state = (0, None)
+                return _EOF, len(buf), []
+            buf += chunk
 
     async def read(self, length=DEFAULT_READ_DATA_LEN):
         """
-        Read response from api
-        :param length:
+        Read response from api up to and including the !done sentence
+        :param length: chunk size to read from socket
         :return:
         """
-        res = b''
+        buf = self._read_buf
+        res = bytearray()
         while True:
-            data = await self.reader.read(length)
-            if not data:
-                break
-            res += data
-            if b'!done' in data:
+            reply, end, _ = await self._read_sentence(length)
+            with memoryview(buf)[:end] as sentence:
+                res += sentence
+            del buf[:end]
+            if reply is _EOF or reply == DONE_TAG:
                 break
-        return res
+        return bytes(res)
 
     async def login(self):
         """
@@ -172,16 +365,13 @@ class ApiRosConnection:
         :return:
         """
         try:
-            login_sentence = self._get_login_sentence()
-            self.talk_sentence(login_sentence)
-            # await self.writer.drain()
-            data = await self.reader.read(LOGIN_DATA_LEN)
+            self.writer.write(self._login_frame)
+            self._pending_replies += 1
+            await self.writer.drain()
+            data = await self.read(LOGIN_DATA_LEN)
 
             # login failed
-            if ERROR_TAG in data.decode():
-                raise LoginFailed(self._get_err_message(data))
-
-            if FATAL_ERROR_TAG in data.decode():
+            if ERROR_TAG_B in data or FATAL_ERROR_TAG_B in data:
                 raise LoginFailed(self._get_err_message(data))
 
             return data
@@ -205,10 +395,11 @@ class ApiRosConnection:
             '=password={}'.format(client_psw),
         ]
         self.talk_sentence(sentence)
+        await self.writer.drain()
         data = await self.read()
 
         # login failed
-        if ERROR_TAG in data.decode():
+        if ERROR_TAG_B in data or FATAL_ERROR_TAG_B in data:
             result = self._get_result_dict(-1, self._get_err_message(data))
 
         else:
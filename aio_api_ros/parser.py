@@ -3,6 +3,8 @@ This is an adapted code from this repository
 https://github.com/mrin/miktapi
 """
 
+import sys
+
 from .errors import ParseException
 
 
@@ -13,33 +15,31 @@ def parse_word(word, cast_int=True, cast_bool=True):
     if word.startswith('!'):
         res = ('reply_word', word)
     else:
-        parts = word.split('=')
-        if len(parts) == 1:
-            res = ('message', parts[0])
+        key, sep, value = word.partition('=')
+        if not sep:
+            res = ('message', word)
         else:
-            if parts[0] == '':
-                del parts[0]
-            len_parts = len(parts)
-
-            if len_parts == 1:
-                res = (parts[0], '')
-            elif len_parts == 2:
-                res = (parts[0], cast_by_map(parts[1], cast_int, cast_bool))
-            elif len_parts > 2:
+            if key == '':
+                key, sep, value = value.partition('=')
+            if not sep:
+                res = (key, '')
+            elif '=' not in value:
+                res = (key, cast_by_map(value, cast_int, cast_bool))
+            else:
                 res = [
-                    parts[0],
+                    key,
                     [
                         cast_by_map(v, cast_int, cast_bool) for v
-                        in parts[1:len_parts]
+                        in value.split('=')
                     ],
                 ]
-            else:
-                raise ParseException('Unexpected word format {}'.format(word))
     return res
 
 
 def parse_sentence(sentence, cast_int=True, cast_bool=True):
-    reply_word = sentence[0]
+    # reply words come from a small fixed set, interning them lets callers
+    # compare against constants by identity
+    reply_word = sys.intern(sentence[0])
     if not reply_word.startswith('!'):
         raise ParseException('Unexpected reply word: %s' % reply_word)
     if len(sentence) > 1 and sentence[1].startswith('.tag'):
@@ -0,0 +1,79 @@
+"""
+Simple pool of authenticated connections
+"""
+import asyncio
+
+from .connection import ApiRosConnection
+
+
+class ApiRosPool:
+    """
+    Keeps idle logged in connections per (ip, port, user) for reuse.
+    max_size limits the idle connections kept per key only, acquire()
+    opens a new connection whenever none is idle, so any number of them
+    can be open at once
+    """
+    def __init__(self, max_size: int = 4):
+        self.max_size = max_size
+        self._idle = {}
+        self._closed = False
+
+    @staticmethod
+    def _get_key(conn: ApiRosConnection) -> tuple:
+        return conn.ip, conn.port, conn.user
+
+    def _get_queue(self, key: tuple) -> asyncio.Queue:
+        queue = self._idle.get(key)
+        if queue is None:
+            queue = self._idle[key] = asyncio.Queue(maxsize=self.max_size)
+        return queue
+
+    async def acquire(self, mk_ip: str, mk_port: int, mk_user: str,
+                      mk_psw: str) -> ApiRosConnection:
+        """
+        Return idle connection or open a new one
+        :param mk_ip:
+        :param mk_port:
+        :param mk_user:
+        :param mk_psw:
+        :return:
+        """
+        queue = self._get_queue((mk_ip, mk_port, mk_user))
+        while not queue.empty():
+            conn = queue.get_nowait()
+            if conn.password == mk_psw and conn.is_clean():
+                conn.used = True
+                return conn
+            conn.close()
+        conn = ApiRosConnection(mk_ip, mk_port, mk_user, mk_psw)
+        await conn.connect()
+        conn.used = True
+        return conn
+
+    def release(self, conn: ApiRosConnection):
+        """
+        Return connection to the pool. Closed connections, ones with
+        unread replies and any released after close() are closed and dropped
+        :param conn:
+        :return:
+        """
+        conn.used = False
+        if self._closed or not conn.is_clean():
+            conn.close()
+            return
+        try:
+            self._get_queue(self._get_key(conn)).put_nowait(conn)
+        except asyncio.QueueFull:
+            conn.close()
+
+    def close(self):
+        """
+        Close all idle connections, connections released later are closed
+        instead of being pooled
+        :return:
+        """
+        self._closed = True
+        for queue in self._idle.values():
+            while not queue.empty():
+                queue.get_nowait().close()
+        self._idle.clear()
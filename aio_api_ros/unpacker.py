@@ -21,11 +21,11 @@ class SentenceUnpacker(object):
         self._encoding = encoding
 
     def feed(self, next_bytes):
-        if isinstance(next_bytes, bytes):
-            next_bytes = bytearray(next_bytes)
-        if (len(self._buffer) + len(next_bytes)) > self._max_buffer_size:
+        # accepts bytes, bytearray or memoryview without an extra copy
+        next_bytes = memoryview(next_bytes)
+        if (len(self._buffer) + next_bytes.nbytes) > self._max_buffer_size:
             raise BufferFull
-        self._buffer.extend(next_bytes)
+        self._buffer += next_bytes
 
     @staticmethod
     def _decode_word_len_num_bytes(first_byte):
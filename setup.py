@@ -1,9 +1,38 @@
 import aio_api_ros
-from distutils.core import setup
+from setuptools import Extension
 from setuptools import find_packages
+from setuptools import setup
+from setuptools.command.build_ext import build_ext
 
 VERSION = aio_api_ros.version
 
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    ext_modules = []
+else:
+    ext_modules = cythonize(
+        [Extension('aio_api_ros._wire', ['aio_api_ros/_wire.pyx'])]
+    )
+
+
+class OptionalBuildExt(build_ext):
+    """
+    Speedups are optional, fall back to pure python if compiling fails
+    """
+    def run(self):
+        try:
+            build_ext.run(self)
+        except Exception as e:
+            print('WARNING: building aio_api_ros._wire failed: %s' % e)
+
+    def build_extension(self, ext):
+        try:
+            build_ext.build_extension(self, ext)
+        except Exception as e:
+            print('WARNING: building %s failed: %s' % (ext.name, e))
+
+
 setup(
     name='aio_api_ros',
     version=VERSION,
@@ -13,15 +42,18 @@ setup(
     author='Frostspb',
     description='async implementation Mikrotik api',
     long_description="""async implementation Mikrotik api
-    Only Python 3.5+""",
+    Only Python 3.8+""",
     keywords=["mikrotik", "asyncio", "apiRos"],
     classifiers=[
         "Development Status :: 3 - Alpha",
-        "Programming Language :: Python :: 3.5",
-        "Programming Language :: Python :: 3.6",
-        "Programming Language :: Python :: 3.7",
+        "Programming Language :: Python :: 3.8",
+        "Programming Language :: Python :: 3.9",
+        "Programming Language :: Python :: 3.10",
     ],
+    python_requires='>=3.8',
     install_requires=[
 
     ],
+    ext_modules=ext_modules,
+    cmdclass={'build_ext': OptionalBuildExt},
 )
@@ -0,0 +1,76 @@
+"""
+Minimal Mikrotik api server for tests
+"""
+import asyncio
+
+from aio_api_ros.unpacker import SentenceUnpacker
+
+
+def sentence(*words) -> bytes:
+    """
+    Encode reply sentence, words must be shorter than 128 bytes
+    """
+    res = bytearray()
+    for word in words:
+        encoded = word.encode()
+        res.append(len(encoded))
+        res += encoded
+    res.append(0)
+    return bytes(res)
+
+
+DONE = sentence('!done')
+
+
+class FakeRouter:
+    """
+    Answers each command with configured segments, every segment is
+    flushed separately so replies reach the client in several reads;
+    a None segment closes the connection
+    """
+    def __init__(self, replies=None):
+        self.replies = {'/login': [DONE]}
+        self.replies.update(replies or {})
+        self.received = []
+        self.writers = []
+        self.server = None
+        self.port = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(
+            self._handle, '127.0.0.1', 0
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def _handle(self, reader, writer):
+        self.writers.append(writer)
+        unpacker = SentenceUnpacker(encoding='utf-8')
+        while True:
+            try:
+                data = await reader.read(4096)
+            except ConnectionError:
+                break
+            if not data:
+                break
+            unpacker.feed(data)
+            for words in unpacker:
+                self.received.append(words)
+                for segment in self.replies.get(words[0], [DONE]):
+                    if segment is None:
+                        writer.close()
+                        return
+                    writer.write(segment)
+                    await writer.drain()
+                    await asyncio.sleep(0.01)
+        writer.close()
+
+    def drop_connections(self):
+        for writer in self.writers:
+            writer.close()
+        self.writers = []
+
+    async def close(self):
+        self.drop_connections()
+        self.server.close()
+        await self.server.wait_closed()
@@ -0,0 +1,240 @@
+import asyncio
+import unittest
+
+from aio_api_ros.connection import ApiRosConnection
+from aio_api_ros.connection import _scan_sentence
+from aio_api_ros.errors import LoginFailed
+
+from .fake_router import DONE
+from .fake_router import FakeRouter
+from .fake_router import sentence
+
+
+class EncodeSentenceTestCase(unittest.TestCase):
+    def test_empty_sentence_is_terminator_only(self):
+        self.assertEqual(ApiRosConnection._encode_sentence([]), b'\x00')
+        self.assertEqual(ApiRosConnection._encode_sentence(()), b'\x00')
+
+    def test_sentence(self):
+        self.assertEqual(
+            ApiRosConnection._encode_sentence(['/ip/print', '=a=b']),
+            b'\x09/ip/print\x04=a=b\x00'
+        )
+
+    def test_any_iterable(self):
+        words = (w for w in ['/ip/print', '=a=b'])
+        self.assertEqual(
+            ApiRosConnection._encode_sentence(words),
+            b'\x09/ip/print\x04=a=b\x00'
+        )
+
+
+class ScanSentenceTestCase(unittest.TestCase):
+    def test_whole_sentence(self):
+        data = sentence('!re', '=a=b') + DONE
+        self.assertEqual(_scan_sentence(data), (10, 10, [(1, 4), (5, 9)]))
+
+    def test_empty_sentence(self):
+        self.assertEqual(_scan_sentence(b'\x00' + DONE), (1, 1, []))
+
+    def test_resume(self):
+        data = sentence('!re', '=a=b')
+        # '!re' is complete, '=a=b' is not
+        self.assertEqual(_scan_sentence(data[:6]), (-1, 4, [(1, 4)]))
+        self.assertEqual(
+            _scan_sentence(data, 4, [(1, 4)]), (10, 10, [(1, 4), (5, 9)])
+        )
+
+    def test_resume_skips_scanned_words(self):
+        # a control byte before the resume offset would raise if rescanned
+        data = b'\xff' + sentence('=a=b')
+        self.assertEqual(_scan_sentence(data, 1, []), (7, 7, [(2, 6)]))
+
+    def test_byte_by_byte(self):
+        data = sentence('!re', '=name=' + 'x' * 100, '=mtu=1500')
+        state = (0, None)
+        for size in range(1, len(data)):
+            end, pos, words = _scan_sentence(data[:size], *state)
+            self.assertEqual(end, -1)
+            self.assertGreaterEqual(pos, state[0])
+            state = (pos, words)
+        self.assertEqual(
+            _scan_sentence(data, *state),
+            (len(data), len(data), [(1, 4), (5, 111), (112, 121)])
+        )
+
+
+class RouterTestCase(unittest.IsolatedAsyncioTestCase):
+    replies = {}
+
+    async def asyncSetUp(self):
+        self.router = await FakeRouter(self.replies).start()
+        self.conn = ApiRosConnection(
+            '127.0.0.1', self.router.port, 'admin', 'secret'
+        )
+        await self.conn.connect()
+
+    async def asyncTearDown(self):
+        self.conn.close()
+        await self.router.close()
+
+
+SPLIT_REPLY = sentence('!re', '=name=a') + DONE
+LONG_REPLY = sentence('!re', '=name=' + 'x' * 100, '=mtu=1500') + DONE
+
+
+class ReadTestCase(RouterTestCase):
+    replies = {
+        '/ip/address/add': [sentence('!done', '=ret=*1')],
+        '/tagged': [sentence('!done', '.tag=5')],
+        '/split': [SPLIT_REPLY[:3], SPLIT_REPLY[3:14], SPLIT_REPLY[14:]],
+        '/long': [LONG_REPLY[i:i + 8] for i in range(0, len(LONG_REPLY), 8)],
+        '/empty': [b'\x00', SPLIT_REPLY],
+    }
+
+    async def test_done_with_attributes(self):
+        for path, done in (('/ip/address/add', sentence('!done', '=ret=*1')),
+                           ('/tagged', sentence('!done', '.tag=5'))):
+            self.conn.talk_sentence([path])
+            data = await asyncio.wait_for(self.conn.read(), 2)
+            self.assertEqual(data, done)
+
+    async def test_reply_split_across_segments(self):
+        self.conn.talk_sentence(['/split'])
+        self.conn.talk_sentence(['/ip/address/add'])
+        data = await asyncio.wait_for(self.conn.read(), 2)
+        self.assertEqual(data, SPLIT_REPLY)
+        data = await asyncio.wait_for(self.conn.read(), 2)
+        self.assertEqual(data, sentence('!done', '=ret=*1'))
+
+    async def test_sentence_split_across_many_segments(self):
+        self.conn.talk_sentence(['/long'])
+        data = await asyncio.wait_for(self.conn.read(), 2)
+        self.assertEqual(data, LONG_REPLY)
+
+    async def test_empty_sentence_is_not_eof(self):
+        self.conn.talk_sentence(['/empty'])
+        data = await asyncio.wait_for(self.conn.read(), 2)
+        self.assertEqual(data, b'\x00' + SPLIT_REPLY)
+
+
+class QueryTestCase(RouterTestCase):
+    replies = {
+        '/interface/print': [
+            sentence('!re', '=name=eth0', '=mtu=1500', '=running=true'),
+            DONE,
+        ],
+        '/nope': [
+            sentence('!trap', '=message=no such command prefix'),
+            DONE,
+        ],
+        '/bad': [sentence('!trap', '=message=failure'), DONE],
+        '/empty': [b'\x00', sentence('!re', '=name=a'), DONE],
+        '/list': [
+            sentence('!re', '=name=a'),
+            sentence('!re', '=name=b'),
+            sentence('!re', '=name=c'),
+            DONE,
+        ],
+        '/big': [
+            b''.join(sentence('!re', '=n=%d' % i) for i in range(2000)) + DONE
+        ],
+    }
+
+    async def collect(self, path, *args, **kwargs):
+        return [obj async for obj in self.conn.query(path, *args, **kwargs)]
+
+    async def test_query(self):
+        res = await self.collect('/interface/print', '=.proplist=name')
+        self.assertEqual(res, [{'name': 'eth0', 'mtu': 1500, 'running': True}])
+        self.assertEqual(
+            self.router.received[-1], ('/interface/print', '=.proplist=name')
+        )
+
+    async def test_optional_trap_consumes_done(self):
+        self.assertEqual(await self.collect('/nope', optional=True), [])
+        res = await self.collect('/interface/print')
+        self.assertEqual(res[0]['name'], 'eth0')
+
+    async def test_trap_raises_and_consumes_done(self):
+        with self.assertRaises(Exception):
+            await self.collect('/bad')
+        res = await self.collect('/interface/print')
+        self.assertEqual(res[0]['name'], 'eth0')
+
+    async def test_early_break_drains_reply(self):
+        async for obj in self.conn.query('/list'):
+            self.assertEqual(obj, {'name': 'a'})
+            break
+        res = await self.collect('/interface/print')
+        self.assertEqual(res[0]['name'], 'eth0')
+
+    async def test_empty_sentence_skipped(self):
+        self.assertEqual(await self.collect('/empty'), [{'name': 'a'}])
+
+    async def test_big_reply(self):
+        res = await self.collect('/big')
+        self.assertEqual(len(res), 2000)
+        self.assertEqual(res[-1], {'n': 1999})
+
+
+class LoginTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.router = await FakeRouter().start()
+        self.conn = ApiRosConnection(
+            '127.0.0.1', self.router.port, 'admin', 'secret'
+        )
+
+    async def asyncTearDown(self):
+        self.conn.close()
+        await self.router.close()
+
+    async def test_long_trap_message(self):
+        message = '=message=' + 'x' * 110
+        self.router.replies['/login'] = [
+            sentence('!trap', message)[:60],
+            sentence('!trap', message)[60:],
+            DONE,
+        ]
+        with self.assertRaises(LoginFailed) as ctx:
+            await self.conn.connect()
+        self.assertEqual(ctx.exception.value, 'x' * 110)
+
+    async def test_done_with_attributes(self):
+        # split right after the reply word, attributes arrive later
+        self.router.replies['/login'] = [
+            sentence('!done', '=ret=abcdef')[:6],
+            sentence('!done', '=ret=abcdef')[6:],
+        ]
+        self.router.replies['/interface/print'] = [
+            sentence('!re', '=name=eth0'), DONE
+        ]
+        await asyncio.wait_for(self.conn.connect(), 2)
+        res = [obj async for obj in self.conn.query('/interface/print')]
+        self.assertEqual(res, [{'name': 'eth0'}])
+
+    async def test_login_client(self):
+        self.router.replies['/ip/hotspot/active/login'] = [
+            sentence('!trap', '=message=invalid'), DONE
+        ]
+        await self.conn.connect()
+        res = await asyncio.wait_for(
+            self.conn.login_client('10.0.0.2', 'user', 'psw'), 2
+        )
+        self.assertEqual(res, {'code': -1, 'message': 'invalid'})
+        self.router.replies['/ip/hotspot/active/login'] = [
+            sentence('!done', '.tag=1')
+        ]
+        res = await asyncio.wait_for(
+            self.conn.login_client('10.0.0.2', 'user', 'psw'), 2
+        )
+        self.assertEqual(res, {'code': 0, 'message': 'OK'})
+        # router closes the connection right after !fatal
+        self.router.replies['/ip/hotspot/active/login'] = [
+            sentence('!fatal', 'session terminated on request'), None
+        ]
+        res = await asyncio.wait_for(
+            self.conn.login_client('10.0.0.2', 'user', 'psw'), 2
+        )
+        self.assertEqual(res, {'code': -1, 'message': ''})
+        self.assertFalse(self.conn.is_clean())
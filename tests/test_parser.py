@@ -0,0 +1,44 @@
+import unittest
+
+from aio_api_ros.errors import ParseException
+from aio_api_ros.parser import parse_sentence
+from aio_api_ros.parser import parse_word
+
+
+class ParseWordTestCase(unittest.TestCase):
+    def test_word_shapes(self):
+        cases = (
+            ('msg', ('message', 'msg')),
+            ('=', ('', '')),
+            ('==', ('', '')),
+            ('=a', ('a', '')),
+            ('=a=', ('a', '')),
+            ('a=', ('a', '')),
+            ('=a=b', ('a', 'b')),
+            ('=a=b=c', ['a', ['b', 'c']]),
+            ('!re', ('reply_word', '!re')),
+        )
+        for word, expected in cases:
+            with self.subTest(word=word):
+                self.assertEqual(parse_word(word), expected)
+
+    def test_cast(self):
+        self.assertEqual(parse_word('=mtu=1500'), ('mtu', 1500))
+        self.assertEqual(parse_word('=running=yes'), ('running', True))
+        self.assertEqual(parse_word('=a=1=no'), ['a', [1, False]])
+        self.assertEqual(
+            parse_word('=mtu=1500', cast_int=False, cast_bool=False),
+            ('mtu', '1500')
+        )
+
+
+class ParseSentenceTestCase(unittest.TestCase):
+    def test_sentence(self):
+        self.assertEqual(
+            parse_sentence(['!re', '.tag=5', '=name=eth0', '=mtu=1500']),
+            ('!re', '5', {'name': 'eth0', 'mtu': 1500})
+        )
+
+    def test_unexpected_reply_word(self):
+        with self.assertRaises(ParseException):
+            parse_sentence(['=name=eth0'])
@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+
+from aio_api_ros import ApiRosConnection
+from aio_api_ros import ApiRosPool
+
+from .fake_router import DONE
+from .fake_router import FakeRouter
+from .fake_router import sentence
+
+
+class PoolTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.router = await FakeRouter({
+            '/interface/print': [
+                sentence('!re', '=name=a'), sentence('!re', '=name=b'), DONE
+            ],
+        }).start()
+        self.pool = ApiRosPool(max_size=1)
+
+    async def asyncTearDown(self):
+        self.pool.close()
+        await self.router.close()
+
+    async def acquire(self, psw='secret'):
+        return await self.pool.acquire(
+            '127.0.0.1', self.router.port, 'admin', psw
+        )
+
+    def logins(self):
+        return sum(1 for words in self.router.received if words[0] == '/login')
+
+    async def test_reuse(self):
+        conn = await self.acquire()
+        self.assertTrue(conn.used)
+        self.pool.release(conn)
+        self.assertFalse(conn.used)
+        self.assertIs(await self.acquire(), conn)
+        res = [obj async for obj in conn.query('/interface/print')]
+        self.assertEqual(len(res), 2)
+        self.assertEqual(self.logins(), 1)
+
+    async def test_stale_connection_is_replaced(self):
+        conn = await self.acquire()
+        self.pool.release(conn)
+        self.router.drop_connections()
+        await asyncio.sleep(0.05)
+        new_conn = await self.acquire()
+        self.assertIsNot(new_conn, conn)
+        self.assertTrue(conn.writer.is_closing())
+        self.assertEqual(self.logins(), 2)
+
+    async def test_queue_full_closes_connection(self):
+        first = await self.acquire()
+        second = await self.acquire()
+        self.assertIsNot(first, second)
+        self.pool.release(first)
+        self.pool.release(second)
+        self.assertFalse(first.writer.is_closing())
+        self.assertTrue(second.writer.is_closing())
+        self.assertIs(await self.acquire(), first)
+
+    async def test_password_mismatch(self):
+        conn = await self.acquire()
+        self.pool.release(conn)
+        other = await self.acquire(psw='other')
+        self.assertIsNot(other, conn)
+        self.assertEqual(other.password, 'other')
+        self.assertTrue(conn.writer.is_closing())
+
+    async def test_unread_reply_is_not_pooled(self):
+        conn = await self.acquire()
+        async for _ in conn.query('/interface/print'):
+            break
+        self.assertFalse(conn.is_clean())
+        self.pool.release(conn)
+        self.assertTrue(conn.writer.is_closing())
+        self.assertIsNot(await self.acquire(), conn)
+
+    async def test_release_after_close(self):
+        conn = await self.acquire()
+        self.pool.close()
+        self.pool.release(conn)
+        self.assertTrue(conn.writer.is_closing())
+        self.assertEqual(self.pool._idle, {})
+
+
+class ContextManagerTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_async_with(self):
+        router = await FakeRouter().start()
+        conn = ApiRosConnection('127.0.0.1', router.port, 'admin', 'secret')
+        self.assertFalse(conn.is_clean())
+        async with conn as entered:
+            self.assertIs(entered, conn)
+            self.assertTrue(conn.is_clean())
+        self.assertTrue(conn.writer.is_closing())
+        self.assertEqual(router.received, [
+            ('/login', '=name=admin', '=password=secret')
+        ])
+        await router.close()
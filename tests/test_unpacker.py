@@ -0,0 +1,36 @@
+import unittest
+
+from aio_api_ros.errors import BufferFull
+from aio_api_ros.unpacker import SentenceUnpacker
+
+from .fake_router import DONE
+from .fake_router import sentence
+
+REPLY = sentence('!re', '=name=a') + DONE
+
+
+class FeedTestCase(unittest.TestCase):
+    def unpack(self, data):
+        unpacker = SentenceUnpacker()
+        unpacker.feed(data)
+        return list(unpacker)
+
+    def test_bytes(self):
+        self.assertEqual(
+            self.unpack(REPLY), [('!re', '=name=a'), ('!done',)]
+        )
+
+    def test_bytearray(self):
+        self.assertEqual(self.unpack(bytearray(REPLY)), self.unpack(REPLY))
+
+    def test_memoryview(self):
+        buf = bytearray(b'xx' + REPLY)
+        with memoryview(buf)[2:] as view:
+            self.assertEqual(self.unpack(view), self.unpack(REPLY))
+        # the unpacker holds no view of the fed buffer
+        del buf[:]
+
+    def test_buffer_full(self):
+        unpacker = SentenceUnpacker(max_buffer_size=4)
+        with self.assertRaises(BufferFull):
+            unpacker.feed(memoryview(REPLY))
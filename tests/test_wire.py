@@ -0,0 +1,88 @@
+import importlib
+import sys
+import unittest
+
+import aio_api_ros
+from aio_api_ros.unpacker import SentenceUnpacker
+
+try:
+    from aio_api_ros import _wire
+except ImportError:
+    _wire = None
+
+# lengths around each prefix size boundary
+EDGES = (
+    0, 1, 0x7F, 0x80, 0x3FFF, 0x4000, 0x1FFFFF, 0x200000,
+    0xFFFFFFF, 0x10000000, 0xFFFFFFFF,
+)
+
+
+def import_pure_connection():
+    """
+    Import a fresh copy of connection module without the C helpers
+    """
+    names = ('aio_api_ros.connection', 'aio_api_ros._wire')
+    saved = {name: sys.modules.pop(name) for name in names
+             if name in sys.modules}
+    sys.modules['aio_api_ros._wire'] = None
+    try:
+        return importlib.import_module('aio_api_ros.connection')
+    finally:
+        for name in names:
+            sys.modules.pop(name, None)
+        sys.modules.update(saved)
+        # importing a submodule rebinds it on the package as well
+        aio_api_ros.connection = saved['aio_api_ros.connection']
+
+
+pure = import_pure_connection()
+
+
+class EncodeLenMixin:
+    def test_round_trip(self):
+        for length in EDGES:
+            encoded = self.encode_len(length)
+            if length < 0x10000000:
+                self.assertEqual(
+                    SentenceUnpacker._decode_word_len(encoded), length
+                )
+            else:
+                self.assertEqual(encoded[0], 0xF0)
+                self.assertEqual(int.from_bytes(encoded[1:], 'big'), length)
+
+    def test_prefix_size(self):
+        sizes = (1, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5)
+        for length, size in zip(EDGES, sizes):
+            self.assertEqual(len(self.encode_len(length)), size)
+
+
+class PureEncodeLenTestCase(EncodeLenMixin, unittest.TestCase):
+    encode_len = staticmethod(pure._encode_len)
+
+
+@unittest.skipIf(_wire is None, 'aio_api_ros._wire is not built')
+class WireEncodeLenTestCase(EncodeLenMixin, unittest.TestCase):
+    if _wire is not None:
+        encode_len = staticmethod(_wire.encode_len)
+
+    def test_same_as_pure(self):
+        for length in list(range(0x10000)) + list(EDGES):
+            self.assertEqual(
+                _wire.encode_len(length), pure._encode_len(length)
+            )
+        for encode_len in (_wire.encode_len, pure._encode_len):
+            with self.assertRaises(OverflowError):
+                encode_len(0x100000000)
+            with self.assertRaises(ValueError):
+                encode_len(-1)
+
+    def test_pack_word_same_as_pure(self):
+        for word in ('', 'a', '/ip/print', 'ä' * 100, 'x' * 0x4000):
+            self.assertEqual(_wire.pack_word(word), pure._pack_word(word))
+
+    def test_find_message_same_as_pure(self):
+        for data in (b'', b'=message=', b'\x05!trap\x0d=message=boom\x00',
+                     b'==message=x', b'=messag', b'=message=no end'):
+            self.assertEqual(
+                _wire.find_message(data), pure._find_message(data)
+            )